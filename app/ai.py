@@ -1,6 +1,5 @@
 from .config import settings
 from jinja2 import Template
-import google.generativeai as genai
 
 # =========================
 # Fallback Jinja templates
@@ -95,6 +94,8 @@ def render_with_gemini(step: int, ctx: dict) -> str:
     Services: Web apps, E-commerce, Mobile apps, AI Automation, AI Solutions
     """
     import json
+    # Heavy SDK: only imported when Gemini is actually configured and used.
+    import google.generativeai as genai
 
     genai.configure(api_key=settings.GEMINI_API_KEY)
     model = genai.GenerativeModel(settings.GEMINI_MODEL)
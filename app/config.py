@@ -9,6 +9,18 @@ class Settings(BaseModel):
     PORTFOLIO_URL: str = os.getenv("PORTFOLIO_URL", "")
     CV_URL: str = os.getenv("CV_URL", "")
     UNSUB_BASE_URL: str = os.getenv("UNSUB_BASE_URL", "http://localhost:8000/unsubscribe")
+    SIGNING_SECRET: str = os.getenv("SIGNING_SECRET", "")  # HMAC key for unsubscribe/tracking links
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")  # bearer token for /stats, /contacts/*; unset disables them
+
+    # Open tracking (HTML bodies only): 1x1 pixel at {TRACK_BASE_URL}/<token>
+    TRACK_OPENS: bool = os.getenv("TRACK_OPENS", "false").lower() in ("1", "true", "yes")
+    TRACK_BASE_URL: str = os.getenv("TRACK_BASE_URL", "http://localhost:8000/o")
+    OPEN_FLUSH_BATCH: int = int(os.getenv("OPEN_FLUSH_BATCH", "500"))
+    OPEN_FLUSH_SECONDS: float = float(os.getenv("OPEN_FLUSH_SECONDS", "10"))
+
+    # Unsubscribes are buffered in memory and written in batches
+    SUPPRESS_FLUSH_BATCH: int = int(os.getenv("SUPPRESS_FLUSH_BATCH", "200"))
+    SUPPRESS_FLUSH_SECONDS: float = float(os.getenv("SUPPRESS_FLUSH_SECONDS", "5"))
 
     FROM_EMAIL: str = os.getenv("FROM_EMAIL", "")
     FROM_NAME: str = os.getenv("FROM_NAME", "Outreach Bot")
@@ -33,8 +45,30 @@ class Settings(BaseModel):
     FU2_DELAY_HOURS: int = int(os.getenv("FU2_DELAY_HOURS", "48"))
     CUTOFF_DELAY_HOURS: int = int(os.getenv("CUTOFF_DELAY_HOURS", "168"))
 
+    # Campaign segment (JSON), e.g. {"title": ["CTO"], "country": ["United States"], "company_size": ["11-50"]}
+    SEGMENT: str = os.getenv("SEGMENT", "")
+
+    # Lead scoring rules (JSON), merged over app/scoring.py defaults, e.g.
+    # {"title": {"cto": 40}, "country": {"united states": 15}}
+    SCORING_RULES: str = os.getenv("SCORING_RULES", "")
+
+    # Pre-flight address validation (import + before intro selection)
+    VALIDATE_EMAILS: bool = os.getenv("VALIDATE_EMAILS", "true").lower() in ("1", "true", "yes")
+    VALIDATE_MX: bool = os.getenv("VALIDATE_MX", "false").lower() in ("1", "true", "yes")
+    REJECT_ROLE_ACCOUNTS: bool = os.getenv("REJECT_ROLE_ACCOUNTS", "true").lower() in ("1", "true", "yes")
+    DISPOSABLE_DOMAINS: str = os.getenv("DISPOSABLE_DOMAINS", "")  # comma-separated extras
+    DOMAIN_VERDICT_TTL_HOURS: int = int(os.getenv("DOMAIN_VERDICT_TTL_HOURS", "168"))
+
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
     TIMEZONE: str = os.getenv("TIMEZONE", "Asia/Karachi")
 
+    # Recipient-local send windows (zone resolved from Contact.country)
+    DEFAULT_CONTACT_TZ: str = os.getenv("DEFAULT_CONTACT_TZ", os.getenv("TIMEZONE", "Asia/Karachi"))
+    COUNTRY_TZ: str = os.getenv("COUNTRY_TZ", "")  # JSON overrides, e.g. {"United States": "America/Chicago"}
+    SEND_WINDOW_START_HOUR: int = int(os.getenv("SEND_WINDOW_START_HOUR", "9"))
+    SEND_WINDOW_END_HOUR: int = int(os.getenv("SEND_WINDOW_END_HOUR", "17"))
+    SEND_WEEKDAYS_ONLY: bool = os.getenv("SEND_WEEKDAYS_ONLY", "true").lower() in ("1", "true", "yes")
+    DISPATCH_INTERVAL_MINUTES: int = int(os.getenv("DISPATCH_INTERVAL_MINUTES", "15"))
+
 settings = Settings()
@@ -0,0 +1,24 @@
+# app/countries.py
+# Country spellings seen in imports -> one canonical lowercased name, so
+# scoring rules and the country -> time zone map only list full names.
+COUNTRY_ALIASES = {
+    "usa": "united states", "us": "united states", "u.s.": "united states", "u.s.a.": "united states",
+    "united states of america": "united states", "america": "united states",
+    "uk": "united kingdom", "u.k.": "united kingdom", "gb": "united kingdom", "great britain": "united kingdom",
+    "england": "united kingdom", "scotland": "united kingdom", "wales": "united kingdom",
+    "uae": "united arab emirates", "ae": "united arab emirates",
+    "ca": "canada", "mx": "mexico", "br": "brazil", "ar": "argentina", "ie": "ireland",
+    "de": "germany", "deutschland": "germany", "fr": "france", "es": "spain", "it": "italy",
+    "nl": "netherlands", "holland": "netherlands", "the netherlands": "netherlands",
+    "be": "belgium", "ch": "switzerland", "se": "sweden", "no": "norway", "dk": "denmark",
+    "pl": "poland", "pt": "portugal", "tr": "turkey", "türkiye": "turkey", "turkiye": "turkey",
+    "sa": "saudi arabia", "ksa": "saudi arabia", "pk": "pakistan", "in": "india",
+    "sg": "singapore", "jp": "japan", "cn": "china", "au": "australia", "nz": "new zealand",
+    "za": "south africa", "ng": "nigeria", "eg": "egypt",
+}
+
+
+def normalize_country(value: str | None) -> str:
+    """Lowercased canonical country name ('USA' -> 'united states'); '' if empty."""
+    v = (value or "").strip().lower()
+    return COUNTRY_ALIASES.get(v, v)
@@ -1,10 +1,16 @@
 # app/csv_import.py
-import json
-import pandas as pd
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from .db import engine, SessionLocal, Base
+from .db import SessionLocal, init_db
 from .models import Contact
+from .config import settings
+from .validation import AddressValidator
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 HEADER_MAP = {
     "email": "email",
@@ -12,24 +18,100 @@ HEADER_MAP = {
     "last": "last_name",
     "company": "company",
     "company type": "company_focus",
-    "title": "__extra__title",
-    "company linkedin url": "__extra__company_linkedin_url",
-    "linkedin url": "__extra__linkedin_url",
-    "website": "__extra__website",
-    "country": "__extra__country",
-    "company size": "__extra__company_size",
+    "title": "title",
+    "company linkedin url": "company_linkedin_url",
+    "linkedin url": "linkedin_url",
+    "website": "website",
+    "country": "country",
+    "company size": "company_size",
 }
 
-def normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
-    lower_map = {c.lower().strip(): c for c in df.columns}
+# Contact columns filled from the CSV (everything in HEADER_MAP except the key)
+CONTACT_FIELDS = [v for v in HEADER_MAP.values() if v != "email"]
+
+def map_headers(columns) -> dict:
+    """Original column name -> Contact field, for headers found in HEADER_MAP (case-insensitive)."""
     rename = {}
-    for norm, orig in lower_map.items():
+    for orig in columns:
+        norm = str(orig).lower().strip()
         if norm in HEADER_MAP:
             rename[orig] = HEADER_MAP[norm]
-    return df.rename(columns=rename)
+    return rename
+
+def normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
+    return df.rename(columns=map_headers(df.columns))
+
+class ContactUpserter:
+    """
+    Validates, de-dups and upserts contacts, committing every `batch_size` rows.
+    Shared by import_csv (pandas, file on disk) and the streaming HTTP upload.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 5000):
+        self.db = db
+        self.batch_size = batch_size
+        self.validator = AddressValidator(db) if settings.VALIDATE_EMAILS else None
+        self.rejected: dict[str, int] = {}
+        self.seen = set()  # emails in the uncommitted batch; later repeats hit the DB row
+        self.count = 0
+        self._last_new = None
+
+    def add(self, email: str, values: dict):
+        """`email` is stripped/lowercased; `values` holds non-empty CONTACT_FIELDS only."""
+        if self.validator:
+            verdict = self.validator.check(email)
+            if not verdict.ok:
+                self.rejected[verdict.reason] = self.rejected.get(verdict.reason, 0) + 1
+                return
+            email = verdict.email
+        if email in self.seen:
+            return
+        self.seen.add(email)
+
+        db = self.db
+        existing = db.get(Contact, email)
+        if existing:
+            # Update fields that are provided
+            for col, v in values.items():
+                setattr(existing, col, v)
+            db.add(existing)
+        else:
+            c = Contact(
+                email=email,
+                status="no_sync",
+                sequence_step=0,
+                **values,
+            )
+            db.add(c)
+            self._last_new = c
+
+        self.count += 1
+        if self.count % self.batch_size == 0:
+            self.commit(email)
+
+    def commit(self, email: str | None = None):
+        if self.validator:
+            self.validator.flush()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            # Safety retry per-row in rare race with duplicates
+            try:
+                if email and self._last_new is not None and not self.db.get(Contact, email):
+                    self.db.add(self._last_new)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                # skip problematic row
+        # committed rows are found via db.get(); keep memory bounded by batch_size
+        self.seen.clear()
+        self._last_new = None
 
 def import_csv(path: str):
-    Base.metadata.create_all(bind=engine)
+    import pandas as pd  # heavy; loaded only when an import actually runs
+
+    init_db()
     df = pd.read_csv(path)
 
     # Normalize headers and ensure email presence
@@ -39,7 +121,7 @@ def import_csv(path: str):
 
     # Normalize/clean email & basic fields
     df["email"] = df["email"].astype(str).str.strip().str.lower()
-    for col in ["first_name", "last_name", "company", "company_focus"]:
+    for col in CONTACT_FIELDS:
         if col not in df.columns:
             df[col] = None
 
@@ -49,77 +131,20 @@ def import_csv(path: str):
     # Drop duplicate emails (case-insensitive already)
     df = df.drop_duplicates(subset=["email"], keep="first").reset_index(drop=True)
 
-    extra_cols = [c for c in df.columns if c.startswith("__extra__")]
-
     db: Session = SessionLocal()
-    seen = set()
     try:
-        count = 0
+        upserter = ContactUpserter(db)
         for _, row in df.iterrows():
-            email = row["email"]
-            if email in seen:
-                continue
-            seen.add(email)
-
-            # Build extras JSON
-            extras = {}
-            for c in extra_cols:
-                v = row.get(c)
+            values = {}
+            for col in CONTACT_FIELDS:
+                v = row.get(col)
                 if pd.notna(v) and str(v).strip():
-                    extras[c.replace("__extra__", "").strip("_")] = str(v).strip()
-            notes = json.dumps(extras, ensure_ascii=False) if extras else None
-
-            existing = db.get(Contact, email)
-            if existing:
-                # Update a few fields if provided
-                if pd.notna(row.get("first_name")) and str(row.get("first_name")).strip():
-                    existing.first_name = str(row["first_name"]).strip()
-                if pd.notna(row.get("last_name")) and str(row.get("last_name")).strip():
-                    existing.last_name = str(row["last_name"]).strip()
-                if pd.notna(row.get("company")) and str(row.get("company")).strip():
-                    existing.company = str(row["company"]).strip()
-                if pd.notna(row.get("company_focus")) and str(row.get("company_focus")).strip():
-                    existing.company_focus = str(row["company_focus"]).strip()
-                # Merge notes
-                if notes:
-                    try:
-                        old = json.loads(existing.notes) if existing.notes else {}
-                    except Exception:
-                        old = {}
-                    old.update(extras)
-                    existing.notes = json.dumps(old, ensure_ascii=False)
-                db.add(existing)
-            else:
-                c = Contact(
-                    email=email,
-                    first_name=str(row["first_name"]).strip() if pd.notna(row.get("first_name")) else None,
-                    last_name=str(row["last_name"]).strip() if pd.notna(row.get("last_name")) else None,
-                    company=str(row["company"]).strip() if pd.notna(row.get("company")) else None,
-                    company_focus=str(row["company_focus"]).strip() if pd.notna(row.get("company_focus")) else None,
-                    status="no_sync",
-                    sequence_step=0,
-                    notes=notes,
-                )
-                db.add(c)
-
-            count += 1
-            if count % 5000 == 0:
-                try:
-                    db.commit()
-                except IntegrityError:
-                    db.rollback()
-                    # Safety retry per-row in rare race with duplicates
-                    try:
-                        existing = db.get(Contact, email)
-                        if not existing:
-                            db.add(c)
-                        db.commit()
-                    except Exception:
-                        db.rollback()
-                        # skip problematic row
-                        continue
-
-        db.commit()
-        print(f"Imported/updated {count} unique emails")
+                    values[col] = str(v).strip()
+            upserter.add(row["email"], values)
+
+        upserter.commit()
+        print(f"Imported/updated {upserter.count} unique emails")
+        if upserter.rejected:
+            print(f"Rejected {sum(upserter.rejected.values())} invalid emails: {upserter.rejected}")
     finally:
         db.close()
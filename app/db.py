@@ -6,9 +6,40 @@ engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread":
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_schema_ready = False
+
+def init_db():
+    """Create tables once per process (API startup, scheduler and importer all call this)."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    from . import models  # noqa: F401  (register tables on Base.metadata)
+    from . import stats  # noqa: F401  (counter hooks on SessionLocal)
+    from . import scoring  # noqa: F401  (re-score hook on SessionLocal)
+    from . import timezones  # noqa: F401  (tz-from-country hook on SessionLocal)
+    from .migrations import run_migrations
+    # The flush hooks read SCORING_RULES / COUNTRY_TZ: fail at boot, not on every Contact write
+    scoring.scorer()
+    timezones.country_tz_map()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        run_migrations(engine, db)
+    finally:
+        db.close()
+    _schema_ready = True
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def dialect_insert(conn, model):
+    """INSERT for `model` with the backend's ON CONFLICT support (postgresql / sqlite)."""
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
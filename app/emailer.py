@@ -1,5 +1,4 @@
 import re
-import aiosmtplib
 from email.message import EmailMessage
 from .config import settings
 
@@ -31,11 +30,22 @@ def _plaintext_fallback(html: str) -> str:
     return text.strip() + "\n"
 
 
-async def send_email(to_email: str, subject: str, body_text_or_html: str):
+def _with_pixel(html: str, pixel_url: str) -> str:
+    img = f'<img src="{pixel_url}" width="1" height="1" alt="" style="display:block;border:0;width:1px;height:1px">'
+    m = re.search(r"(?i)</\s*body\s*>", html)
+    if m:
+        return html[:m.start()] + img + html[m.start():]
+    return html + img
+
+
+async def send_email(to_email: str, subject: str, body_text_or_html: str,
+                     unsub_url: str | None = None, open_url: str | None = None):
     """
     Sends email via SMTP.
     - If body starts with '<', we treat it as HTML and send multipart/alternative
       (plain-text fallback + HTML). Otherwise plain-text only.
+    - If unsub_url is given, adds RFC 8058 one-click List-Unsubscribe headers.
+    - If open_url is given and the body is HTML, embeds it as a 1x1 tracking pixel.
     """
     msg = EmailMessage()
     msg["From"] = f"{settings.FROM_NAME} <{settings.FROM_EMAIL}>"
@@ -46,7 +56,8 @@ async def send_email(to_email: str, subject: str, body_text_or_html: str):
         # HTML path: add text fallback first, then HTML alternative
         text_part = _plaintext_fallback(body_text_or_html)
         msg.set_content(text_part)
-        msg.add_alternative(body_text_or_html, subtype="html")
+        html = _with_pixel(body_text_or_html, open_url) if open_url else body_text_or_html
+        msg.add_alternative(html, subtype="html")
     else:
         # Plain-text path
         msg.set_content(body_text_or_html)
@@ -55,7 +66,12 @@ async def send_email(to_email: str, subject: str, body_text_or_html: str):
     if getattr(settings, "REPLY_TO", None):
         msg["Reply-To"] = settings.REPLY_TO
 
+    if unsub_url:
+        msg["List-Unsubscribe"] = f"<{unsub_url}>"
+        msg["List-Unsubscribe-Post"] = "List-Unsubscribe=One-Click"
+
     # Send
+    import aiosmtplib
     await aiosmtplib.send(
         msg,
         hostname=settings.SMTP_HOST,
@@ -0,0 +1,68 @@
+# app/export.py
+# Streaming contact export with keyset pagination (email > cursor), so
+# memory stays constant regardless of table size.
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from .db import SessionLocal
+from .models import Contact
+
+EXPORT_FIELDS = [
+    "email", "first_name", "last_name", "company", "company_focus",
+    "title", "country", "company_size", "website", "linkedin_url",
+    "score", "status", "sequence_step", "last_sent_at", "last_reply_at", "opened_at",
+]
+
+PAGE_SIZE = 1000
+
+
+def _fmt(v):
+    return v.isoformat() if isinstance(v, datetime) else v
+
+
+def iter_rows(status: Optional[str] = None, step: Optional[int] = None,
+              after: Optional[str] = None, limit: Optional[int] = None) -> Iterator[dict]:
+    cols = [getattr(Contact, f) for f in EXPORT_FIELDS]
+    last, remaining = after or "", limit
+    db = SessionLocal()
+    try:
+        while remaining is None or remaining > 0:
+            q = db.query(*cols).filter(Contact.email > last)
+            if status:
+                q = q.filter(Contact.status == status)
+            if step is not None:
+                q = q.filter(Contact.sequence_step == step)
+            size = PAGE_SIZE if remaining is None else min(PAGE_SIZE, remaining)
+            page = q.order_by(Contact.email).limit(size).all()
+            if not page:
+                break
+            for row in page:
+                yield {f: _fmt(v) for f, v in zip(EXPORT_FIELDS, row)}
+            last = page[-1][0]
+            if remaining is not None:
+                remaining -= len(page)
+            # Release the read snapshot between pages (no long-lived transaction)
+            db.rollback()
+    finally:
+        db.close()
+
+
+def iter_ndjson(**filters) -> Iterator[str]:
+    for row in iter_rows(**filters):
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def iter_csv(**filters) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for i, row in enumerate(iter_rows(**filters), 1):
+        writer.writerow(row)
+        if i % 500 == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
@@ -1,42 +1,175 @@
 import asyncio
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import PlainTextResponse
-from .db import engine, Base, SessionLocal
-from .models import Suppressed
+import hmac
+from html import escape
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from starlette.requests import ClientDisconnect
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
+from .db import SessionLocal, init_db
 from .config import settings
-from .scheduler import run_scheduler
-from .imap_listener import process_mailbox
+from .export import iter_csv, iter_ndjson
+from .tokens import require_secret
+from .suppression import buffer as suppression_buffer, email_from_token, run_flusher
+from . import tracking, upload
 
 app = FastAPI(title="Outreach Engine")
 
 @app.on_event("startup")
 async def startup():
-    Base.metadata.create_all(bind=engine)
-    # fire-and-forget scheduler
+    # Scheduler pulls in APScheduler/SMTP/Jinja/LLM code; load it only when the app boots.
+    from .scheduler import run_scheduler
+
+    require_secret()
+    init_db()
+    # fire-and-forget scheduler + suppression write-behind
     asyncio.create_task(run_scheduler())
+    asyncio.create_task(run_flusher())
+    asyncio.create_task(tracking.run_flusher())
+
+@app.on_event("shutdown")
+def shutdown():
+    suppression_buffer.flush()
+    tracking.buffer.flush()
+
+def require_admin(authorization: str | None = Header(None)):
+    # The app is public (unsubscribe/pixel links); contact data needs the admin token
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints disabled: ADMIN_TOKEN is not set")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
 
 @app.get("/health")
 def health():
     return {"status":"ok"}
 
-@app.get("/unsubscribe", response_class=PlainTextResponse)
-def unsubscribe(e: str = Query(..., description="Email to unsubscribe")):
-    e = e.strip().lower()
+def _email_or_400(t: str) -> str:
+    e = email_from_token(t)
     if not e:
-        raise HTTPException(status_code=400, detail="Missing email")
-    db = SessionLocal()
-    try:
-        db.merge(Suppressed(email=e, reason="unsubscribe"))
-        db.commit()
-    finally:
-        db.close()
+        raise HTTPException(status_code=400, detail="Invalid unsubscribe link")
+    return e
+
+@app.get("/unsubscribe", response_class=HTMLResponse)
+def unsubscribe_page(t: str = Query(..., description="Signed unsubscribe token")):
+    # GET never writes: link scanners and previewers follow it too
+    e = _email_or_400(t)
+    return f"""<!doctype html><meta name="viewport" content="width=device-width">
+<form method="post" action="?t={escape(t)}">
+  <p>Unsubscribe <strong>{escape(e)}</strong> from further emails?</p>
+  <button type="submit" name="List-Unsubscribe" value="One-Click">Unsubscribe</button>
+</form>"""
+
+@app.post("/unsubscribe", response_class=PlainTextResponse)
+def unsubscribe(t: str = Query(..., description="Signed unsubscribe token")):
+    # RFC 8058 one-click (List-Unsubscribe-Post) and the confirm form both land here
+    suppression_buffer.add(_email_or_400(t), "unsubscribe")
     return "You have been unsubscribed. Sorry to see you go."
 
+@app.get("/o/{token}")
+def open_pixel(token: str):
+    # Always answer with the pixel; only authentic tokens are recorded
+    try:
+        hit = tracking.parse_token(token)
+        if hit:
+            tracking.buffer.add(*hit)
+    except Exception as ex:
+        # a size-triggered flush can hit the DB; the batch stays buffered for retry
+        print(f"[tracking] ⚠️ open not recorded yet: {ex}")
+    return Response(
+        content=tracking.PIXEL_GIF,
+        media_type="image/gif",
+        headers={"Cache-Control": "no-store, no-cache, must-revalidate, private"},
+    )
+
 @app.post("/mailbox/poll", response_class=PlainTextResponse)
 def mailbox_poll():
     # Trigger IMAP poll manually (or via cron outside)
+    from .imap_listener import process_mailbox
     try:
         process_mailbox()
         return "ok"
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex))
+
+@app.get("/stats", dependencies=[Depends(require_admin)])
+def stats():
+    # Reads the pre-aggregated counters only; safe to poll every few seconds
+    from .stats import snapshot
+    db = SessionLocal()
+    try:
+        return snapshot(db)
+    finally:
+        db.close()
+
+@app.get("/contacts/export", dependencies=[Depends(require_admin)])
+def export_contacts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: str | None = Query(None, description="Filter by contact status"),
+    step: int | None = Query(None, description="Filter by sequence_step"),
+    after: str | None = Query(None, description="Keyset cursor: last email already received"),
+    limit: int | None = Query(None, ge=1, description="Max rows (omit for all)"),
+):
+    filters = {"status": status, "step": step, "after": after, "limit": limit}
+    if format == "csv":
+        return StreamingResponse(iter_csv(**filters), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=contacts.csv"})
+    return StreamingResponse(iter_ndjson(**filters), media_type="application/x-ndjson")
+
+async def _receive_upload(job: upload.ImportJob, request: Request) -> dict:
+    try:
+        async for chunk in upload.csv_chunks(request.stream(), request.headers.get("content-type", "")):
+            if job.status == "failed":
+                break
+            await job.feed(chunk)
+    except ValueError as ex:
+        job.fail(str(ex))
+    except ClientDisconnect:
+        # fail before close_input so the worker discards the truncated tail instead of finishing "done"
+        job.fail("upload interrupted")
+    except Exception:
+        job.fail("upload interrupted")
+        raise
+    finally:
+        await job.close_input()
+    if job.status == "failed":
+        raise HTTPException(status_code=400, detail={"job_id": job.id, "error": job.error})
+    return {"job_id": job.id, "status": job.status, "progress_url": f"/contacts/import/{job.id}"}
+
+def _busy(ex: upload.ImportBusy):
+    return HTTPException(status_code=429, detail=str(ex), headers={"Retry-After": "30"})
+
+@app.post("/contacts/import", status_code=202, dependencies=[Depends(require_admin)])
+async def contacts_import(request: Request):
+    # Body is parsed and upserted while it streams in, but the job id is only
+    # returned once it has all arrived; use /contacts/import/jobs + PUT to poll during the upload
+    try:
+        job = upload.start_job()
+    except upload.ImportBusy as ex:
+        raise _busy(ex)
+    return await _receive_upload(job, request)
+
+@app.post("/contacts/import/jobs", status_code=201, dependencies=[Depends(require_admin)])
+def contacts_import_create():
+    # Two-step upload: get the id first, then PUT the body to upload_url
+    job = upload.create_job()
+    return {"job_id": job.id, "status": job.status,
+            "upload_url": f"/contacts/import/{job.id}", "progress_url": f"/contacts/import/{job.id}"}
+
+@app.put("/contacts/import/{job_id}", status_code=202, dependencies=[Depends(require_admin)])
+async def contacts_import_upload(job_id: str, request: Request):
+    job = upload.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown import job")
+    try:
+        started = job.begin()
+    except upload.ImportBusy as ex:
+        raise _busy(ex)
+    if not started:
+        raise HTTPException(status_code=409, detail="Import job already received its upload")
+    return await _receive_upload(job, request)
+
+@app.get("/contacts/import/{job_id}", dependencies=[Depends(require_admin)])
+def contacts_import_status(job_id: str):
+    job = upload.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown import job")
+    return job.as_dict()
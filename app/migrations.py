@@ -0,0 +1,114 @@
+# app/migrations.py
+# Lightweight, idempotent schema upgrades for existing databases.
+# `create_all` only creates missing tables, so new columns/indexes on
+# existing tables and data backfills live here. Each named step runs once
+# and is recorded in `schema_migrations`.
+import json
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .models import Contact, SchemaMigration
+
+# Keys written into Contact.notes by the old importer -> Contact column
+NOTES_ATTRS = ("title", "country", "company_size", "website", "linkedin_url", "company_linkedin_url")
+
+BATCH_SIZE = 5000
+
+
+def add_missing_columns(engine: Engine, table):
+    """ALTER TABLE ADD COLUMN for columns the live table lacks, then create its indexes.
+    NOT NULL columns must carry a server_default."""
+    insp = inspect(engine)
+    if not insp.has_table(table.name):
+        return
+    existing = {c["name"] for c in insp.get_columns(table.name)}
+    with engine.begin() as conn:
+        for col in table.columns:
+            if col.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(dialect=engine.dialect)}"
+            if col.server_default is not None:
+                ddl += f" NOT NULL DEFAULT {col.server_default.arg}" if not col.nullable else f" DEFAULT {col.server_default.arg}"
+            conn.execute(text(ddl))
+        for idx in table.indexes:
+            idx.create(conn, checkfirst=True)
+
+
+def iter_contact_batches(db: Session, *criteria, batch_size: int = BATCH_SIZE):
+    """Yield contacts matching `criteria` in email-keyset batches, committing after each
+    batch, so full-table rewrites never hold the whole table in the session."""
+    last = ""
+    while True:
+        rows = (
+            db.query(Contact)
+            .filter(Contact.email > last, *criteria)
+            .order_by(Contact.email)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        last = rows[-1].email
+        yield rows
+        db.commit()
+
+
+def backfill_contact_attributes(db: Session) -> int:
+    """Move JSON attributes out of Contact.notes into typed columns. Returns rows touched."""
+    touched = 0
+    for rows in iter_contact_batches(db, Contact.notes.isnot(None)):
+        for c in rows:
+            try:
+                extras = json.loads(c.notes)
+            except Exception:
+                continue
+            if not isinstance(extras, dict):
+                continue
+            moved = False
+            for key in NOTES_ATTRS:
+                if key in extras:
+                    val = extras.pop(key)
+                    if getattr(c, key) is None and val:
+                        setattr(c, key, str(val).strip())
+                    moved = True
+            if moved:
+                c.notes = json.dumps(extras, ensure_ascii=False) if extras else None
+                touched += 1
+    return touched
+
+
+def seed_stats(db: Session) -> int:
+    from .stats import rebuild
+    return rebuild(db)
+
+
+def score_contacts(db: Session) -> int:
+    from .scoring import rescore_all
+    return rescore_all(db)
+
+
+def resolve_contact_tz(db: Session) -> int:
+    from .timezones import resolve_all
+    return resolve_all(db)
+
+
+MIGRATIONS = (
+    ("0001_contact_attribute_columns", backfill_contact_attributes),
+    ("0002_seed_stat_counters", seed_stats),
+    ("0003_score_contacts", score_contacts),
+    ("0004_resolve_contact_tz", resolve_contact_tz),
+)
+
+
+def run_migrations(engine: Engine, db: Session):
+    add_missing_columns(engine, Contact.__table__)
+    done = {m.name for m in db.query(SchemaMigration.name).all()}
+    for name, fn in MIGRATIONS:
+        if name in done:
+            continue
+        n = fn(db)
+        db.add(SchemaMigration(name=name))
+        db.commit()
+        print(f"[migrate] {name}: {n} rows")
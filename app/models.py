@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, Index
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 from .db import Base
 
@@ -9,16 +10,65 @@ class Contact(Base):
     last_name = Column(String, nullable=True)
     company = Column(String, nullable=True)
     company_focus = Column(String, nullable=True)
-    status = Column(String, nullable=False, default="no_sync")  # no_sync -> sync -> 1st_followup_sent -> 2nd_followup_sent -> cut_off -> replied/bounced/unsubscribed
-    sequence_step = Column(Integer, nullable=False, default=0)  # 0=intro,1=f1,2=f2,3=cutoff
+    # Segmentable attributes (were JSON in `notes`; see app/migrations.py)
+    title = Column(String, nullable=True, index=True)
+    country = Column(String, nullable=True, index=True)
+    country_key = Column(String, nullable=True, index=True)  # normalised country for segments, see app/countries.py
+    company_size = Column(String, nullable=True, index=True)
+    website = Column(String, nullable=True)
+    linkedin_url = Column(String, nullable=True)
+    company_linkedin_url = Column(String, nullable=True)
+    score = Column(Integer, nullable=False, default=0, server_default="0")  # lead score, see app/scoring.py
+    tz = Column(String, nullable=True)  # recipient IANA zone from country, see app/timezones.py
+    # active_history: load the committed value on change so app/stats.py can
+    # decrement the old bucket even after a commit expired the instance
+    status = column_property(Column(String, nullable=False, default="no_sync"), active_history=True)  # no_sync -> sync -> 1st_followup_sent -> 2nd_followup_sent -> cut_off -> replied/bounced/unsubscribed/invalid
+    sequence_step = column_property(Column(Integer, nullable=False, default=0), active_history=True)  # 0=intro,1=f1,2=f2,3=cutoff
     last_sent_at = Column(DateTime(timezone=True), nullable=True)
     last_reply_at = Column(DateTime(timezone=True), nullable=True)
     opened_at = Column(DateTime(timezone=True), nullable=True)
     thread_id = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
 
+    __table_args__ = (
+        # Segmented intro selection: status + country/size filters
+        Index("ix_contacts_status_country_size", "status", "country_key", "company_size"),
+        # Keyset-paginated export filtered by status
+        Index("ix_contacts_status_email", "status", "email"),
+        # Intro queue: top-N by score within a status
+        Index("ix_contacts_status_score", "status", score.desc(), "email"),
+        # Per-timezone due buckets for the intro dispatcher
+        Index("ix_contacts_status_tz_score", "status", "tz", score.desc(), "email"),
+    )
+
 class Suppressed(Base):
     __tablename__ = "suppressed_emails"
     email = Column(String, primary_key=True)
     reason = Column(String, nullable=True)  # unsubscribe | bounce | manual
     ts = Column(DateTime(timezone=True), server_default=func.now())
+
+class DomainVerdict(Base):
+    __tablename__ = "domain_verdicts"
+    domain = Column(String, primary_key=True)
+    ok = Column(Boolean, nullable=False)
+    reason = Column(String, nullable=True)  # disposable | no_mx
+    checked_at = Column(DateTime(timezone=True), nullable=False)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    name = Column(String, primary_key=True)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# First open per message (email + sequence step), written in batches by app/tracking.py
+class OpenEvent(Base):
+    __tablename__ = "open_events"
+    email = Column(String, primary_key=True)
+    step = Column(Integer, primary_key=True)
+    ts = Column(DateTime(timezone=True), nullable=False)
+
+# Incrementally maintained funnel counters (see app/stats.py)
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+    metric = Column(String, primary_key=True)  # status | step | event | sent_day | replied_day | ...
+    bucket = Column(String, primary_key=True)  # status name / step / event name / YYYY-MM-DD
+    count = Column(Integer, nullable=False, default=0)
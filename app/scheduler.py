@@ -1,15 +1,21 @@
 import asyncio
+import json
+import math
 import random
 from datetime import datetime, timedelta, timezone
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import and_, not_
+from sqlalchemy import and_, func, not_, select
 from sqlalchemy.orm import Session
 
-from .db import engine, SessionLocal, Base
+from .db import SessionLocal, init_db
 from .models import Contact, Suppressed
 from .config import settings
 from .emailer import send_email
-from .ai import build_email
+from .validation import AddressValidator
+from .suppression import buffer as suppression_buffer, unsubscribe_url
+from .tracking import open_url
+from .timezones import in_send_window, open_zones
+from .countries import normalize_country
+from .tokens import require_secret
 
 # ----------------------------
 # Time helpers
@@ -35,48 +41,136 @@ def _per_email_sleep_seconds():
 # ----------------------------
 # Shared ctx builder
 # ----------------------------
-def _ctx_from_contact(c: Contact) -> dict:
+def _ctx_from_contact(c: Contact, step: int) -> dict:
     return {
         "first_name": c.first_name,
         "company": c.company,
         "company_focus": c.company_focus,
         "portfolio_url": settings.PORTFOLIO_URL,
         "cv_url": settings.CV_URL,
-        "unsub_url": settings.UNSUB_BASE_URL,
+        "unsub_url": unsubscribe_url(c.email),
         "email": c.email,
         "from_name": settings.FROM_NAME,
+        "open_url": open_url(c.email, step) if settings.TRACK_OPENS else None,
     }
 
+# ----------------------------
+# Suppression: persisted rows (SQL subquery) + not-yet-flushed unsubscribes
+# ----------------------------
+def _not_suppressed() -> list:
+    filters = [not_(Contact.email.in_(select(Suppressed.email)))]
+    pending = suppression_buffer.pending()
+    if pending:
+        filters.append(not_(Contact.email.in_(pending)))
+    return filters
+
+def _unsubscribed_meanwhile(c: Contact, label: str) -> bool:
+    # Clicks that arrive while a batch is running are only in the overlay
+    if suppression_buffer.contains(c.email):
+        print(f"[{label}] skipping {c.email}: unsubscribed")
+        return True
+    return False
+
+# ----------------------------
+# Segment filters
+# e.g. {"title": ["CTO"], "country": "United States", "company_size": ["11-50"]}
+# Each key becomes an indexed `column IN (...)` predicate in SQL.
+# ----------------------------
+SEGMENT_COLUMNS = {
+    "title": Contact.title,
+    "country": Contact.country_key,
+    "company_size": Contact.company_size,
+    "company_focus": Contact.company_focus,
+}
+
+def _default_segment() -> dict | None:
+    raw = getattr(settings, "SEGMENT", "")
+    return json.loads(raw) if raw else None
+
+def _segment_filters(segment: dict | None) -> list:
+    filters = []
+    for key, values in (segment or {}).items():
+        col = SEGMENT_COLUMNS.get(key)
+        if col is None:
+            raise ValueError(f"Unknown segment attribute: {key}")
+        if isinstance(values, str):
+            values = [values]
+        if key == "country":
+            # "USA", "us", "United States" all match contacts imported under any of those spellings
+            values = [normalize_country(v) for v in values]
+        filters.append(col.in_(list(values)))
+    return filters
+
+# ----------------------------
+# Pre-flight validation
+# ----------------------------
+def _drop_invalid(db: Session, validator: AddressValidator | None, rows: list, label: str) -> list:
+    """
+    Validate picked contacts; invalid ones are marked status='invalid' (and
+    leave the no_sync pool) so they never reach SMTP. Returns the valid rows.
+    """
+    if validator is None:
+        return rows
+    valid = []
+    for c in rows:
+        verdict = validator.check(c.email)
+        if verdict.ok:
+            valid.append(c)
+        else:
+            c.status = "invalid"
+            db.add(c)
+            print(f"[{label}] skipping {c.email}: {verdict.reason}")
+    validator.flush()
+    db.commit()
+    return valid
+
 # ----------------------------
 # Intro batch
 # ----------------------------
-async def send_batch_intro():
+async def send_batch_intro(segment: dict | None = None, tz: str | None = None, limit: int | None = None) -> int:
+    """Send intros to the top-scored no_sync contacts (optionally one tz bucket). Returns sent count."""
+    from .ai import build_email
+
+    if segment is None:
+        segment = _default_segment()
+    cap = settings.DAILY_CAP if limit is None else limit
+    label = f"intro:{tz}" if tz else "intro"
+
     db: Session = SessionLocal()
     sent, skipped = 0, 0
     try:
-        # build a set of suppressed for extra safety (also filter in SQL)
-        suppressed = {s.email for s in db.query(Suppressed.email).all()}
-
         q = (
             db.query(Contact)
             .filter(
                 and_(
                     Contact.status == "no_sync",
-                    not_(Contact.email.in_(suppressed)) if suppressed else True,
+                    Contact.tz == tz if tz else True,
+                    *_not_suppressed(),
+                    *_segment_filters(segment),
                 )
             )
-            .order_by(Contact.email)
-            .limit(settings.DAILY_CAP)
+            # best leads first; served by ix_contacts_status_score / ix_contacts_status_tz_score
+            .order_by(Contact.score.desc(), Contact.email)
+            .limit(cap)
         )
 
-        rows = list(q)
-        print(f"[intro] picked {len(rows)} contacts (cap={settings.DAILY_CAP})")
+        # Re-pick until the cap is filled with valid rows (invalid ones drop out of no_sync)
+        validator = AddressValidator(db) if settings.VALIDATE_EMAILS else None
+        while True:
+            picked = list(q)
+            # MX lookups block for seconds per domain: keep them off the event loop the API shares
+            rows = await asyncio.to_thread(_drop_invalid, db, validator, picked, label)
+            if len(rows) == len(picked):
+                break
+        print(f"[{label}] picked {len(rows)} contacts (cap={cap})")
 
         for c in rows:
+            if _unsubscribed_meanwhile(c, label):
+                continue
             try:
-                ctx = _ctx_from_contact(c)
+                ctx = _ctx_from_contact(c, 0)
                 subject, body = build_email(0, ctx)
-                await send_email(c.email, subject, body)
+                await send_email(c.email, subject, body, unsub_url=ctx["unsub_url"], open_url=ctx["open_url"])
 
                 c.status = "sync"
                 c.sequence_step = 1
@@ -89,26 +183,95 @@ async def send_batch_intro():
             except Exception as e:
                 db.rollback()
                 skipped += 1
-                print(f"[intro] ⚠️ error sending to {c.email}: {e}")
+                print(f"[{label}] ⚠️ error sending to {c.email}: {e}")
 
-        print(f"[intro] done: sent={sent}, errors={skipped}")
+        print(f"[{label}] done: sent={sent}, errors={skipped}")
+        return sent
     finally:
         db.close()
 
+# ----------------------------
+# Recipient-local intro dispatch
+# no_sync contacts are grouped into per-tz buckets (refreshed hourly from
+# ix_contacts_status_tz_score). Each bucket gets a share of DAILY_CAP
+# proportional to its size, released evenly across its local send window,
+# so sending spreads over the day as zones open and close. Fractional credit
+# carries over to the next window, and every non-empty bucket gets at least
+# one send per window, so small zones are never starved by large ones.
+# ----------------------------
+class IntroDispatcher:
+    REFRESH_EVERY = timedelta(hours=1)
+
+    def __init__(self):
+        self.buckets: dict[str, int] = {}
+        self.credit: dict[str, float] = {}
+        self.served: set[str] = set()  # buckets already sent to in their current window
+        self.refreshed_at: datetime | None = None
+
+    def refresh(self):
+        db: Session = SessionLocal()
+        try:
+            rows = (
+                db.query(Contact.tz, func.count())
+                .filter(
+                    Contact.status == "no_sync",
+                    Contact.tz.isnot(None),
+                    *_not_suppressed(),
+                    *_segment_filters(_default_segment()),
+                )
+                .group_by(Contact.tz)
+                .all()
+            )
+        finally:
+            db.close()
+        self.buckets = {tz: n for tz, n in rows}
+        self.refreshed_at = now_utc()
+        print(f"[dispatch] buckets: {self.buckets}")
+
+    def _quota(self, tz: str) -> float:
+        total = sum(self.buckets.values())
+        window_min = max(1, (settings.SEND_WINDOW_END_HOUR - settings.SEND_WINDOW_START_HOUR) * 60)
+        daily = settings.DAILY_CAP * self.buckets[tz] / total
+        return daily * settings.DISPATCH_INTERVAL_MINUTES / window_min
+
+    async def tick(self):
+        now = now_utc()
+        if self.refreshed_at is None or now - self.refreshed_at >= self.REFRESH_EVERY:
+            self.refresh()
+        for tz in sorted(self.buckets, key=self.buckets.get, reverse=True):
+            if self.buckets[tz] <= 0:
+                continue
+            if not in_send_window(tz, now):
+                self.served.discard(tz)  # leftover credit is kept for the next window
+                continue
+            self.credit[tz] = self.credit.get(tz, 0.0) + self._quota(tz)
+            n = math.floor(self.credit[tz])
+            if n < 1 and tz not in self.served:
+                n = 1  # at least one send per window for every non-empty bucket
+            if n < 1:
+                continue
+            self.credit[tz] = max(0.0, self.credit[tz] - n)
+            self.served.add(tz)
+            sent = await send_batch_intro(tz=tz, limit=n)
+            self.buckets[tz] = max(0, self.buckets[tz] - sent)
+
+dispatcher = IntroDispatcher()
+
 # ----------------------------
 # Generic follow-up runner
 # step_expected: 1 (FU1) / 2 (FU2) / 3 (cutoff)
 # hours_delay: FU1_DELAY_HOURS / FU2_DELAY_HOURS / CUTOFF_DELAY_HOURS
 # new_status: '1st_followup_sent' / '2nd_followup_sent' / 'cut_off'
 # ----------------------------
-async def followup(step_expected: int, hours_delay: int, new_status: str):
+async def followup(step_expected: int, hours_delay: int, new_status: str, segment: dict | None = None):
+    # No default segment here: anyone who got an intro keeps their sequence
+    from .ai import build_email
+
     db: Session = SessionLocal()
     sent, skipped = 0, 0
     try:
         threshold = now_utc() - timedelta(hours=hours_delay)
 
-        suppressed = {s.email for s in db.query(Suppressed.email).all()}
-
         q = (
             db.query(Contact)
             .filter(
@@ -117,7 +280,9 @@ async def followup(step_expected: int, hours_delay: int, new_status: str):
                     Contact.sequence_step == step_expected,
                     Contact.last_sent_at <= threshold,
                     Contact.last_reply_at.is_(None),
-                    not_(Contact.email.in_(suppressed)) if suppressed else True,
+                    Contact.tz.in_(open_zones(now_utc())),
+                    *_not_suppressed(),
+                    *_segment_filters(segment),
                 )
             )
             .order_by(Contact.last_sent_at)
@@ -129,10 +294,12 @@ async def followup(step_expected: int, hours_delay: int, new_status: str):
         print(f"[{label}] picked {len(rows)} contacts (cap={settings.DAILY_CAP}, threshold={threshold.isoformat()})")
 
         for c in rows:
+            if _unsubscribed_meanwhile(c, label):
+                continue
             try:
-                ctx = _ctx_from_contact(c)
+                ctx = _ctx_from_contact(c, step_expected)
                 subject, body = build_email(step_expected, ctx)
-                await send_email(c.email, subject, body)
+                await send_email(c.email, subject, body, unsub_url=ctx["unsub_url"], open_url=ctx["open_url"])
 
                 c.status = new_status
                 c.sequence_step = step_expected + 1
@@ -155,18 +322,22 @@ async def followup(step_expected: int, hours_delay: int, new_status: str):
 # Scheduler bootstrap
 # ----------------------------
 async def run_scheduler():
-    # Ensure schema exists
-    Base.metadata.create_all(bind=engine)
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    # Every send carries a signed unsubscribe link; fail here, not per message
+    require_secret()
+    # Ensure schema exists (no-op if the API startup already did it)
+    init_db()
 
     tz = _tz()
     scheduler = AsyncIOScheduler(timezone=tz)
 
-    # 1) Daily intro batch: ~09:30 PKT (04:30 UTC)
+    # 1) Intro dispatch: release per-timezone buckets during their local send window
     scheduler.add_job(
-        send_batch_intro,
-        "cron",
-        hour=9, minute=30,
-        id="daily_intro_batch",
+        dispatcher.tick,
+        "interval",
+        minutes=settings.DISPATCH_INTERVAL_MINUTES,
+        id="intro_dispatch",
         replace_existing=True,
         coalesce=True,
         max_instances=1,
@@ -194,12 +365,12 @@ async def run_scheduler():
         max_instances=1,
     )
 
-    # 4) Cutoff (7d after FU2) — check daily, evening slot
+    # 4) Cutoff (7d after FU2) — evaluate hourly so every zone's window is covered
     scheduler.add_job(
         lambda: followup(3, settings.CUTOFF_DELAY_HOURS, "cut_off"),
-        "cron",
-        hour=18, minute=0,
-        id="cutoff_daily",
+        "interval",
+        minutes=60,
+        id="cutoff_hourly",
         replace_existing=True,
         coalesce=True,
         max_instances=1,
@@ -209,7 +380,7 @@ async def run_scheduler():
     #    Uncomment to fire once ~10s after boot (remember to re-comment later)
     from datetime import timedelta as _td
     scheduler.add_job(
-        send_batch_intro,
+        dispatcher.tick,
         "date",
         run_date=datetime.now(tz=scheduler.timezone) + _td(seconds=10),
         id="one_time_kick",
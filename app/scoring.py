@@ -0,0 +1,115 @@
+# app/scoring.py
+# Lead scoring: points per matching attribute, stored in Contact.score.
+# Scores are (re)computed on flush whenever a scored attribute changes, so
+# imports score in bulk and edits re-score incrementally; the intro batch
+# then picks the top N via the (status, score DESC) index.
+import json
+import re
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .countries import normalize_country
+from .db import SessionLocal
+from .migrations import iter_contact_batches
+from .models import Contact
+
+# attribute -> {pattern: points}. `title` patterns match whole words
+# (case-insensitive); `country` matches the canonical name from
+# app/countries.py ("USA" -> "united states"); other attributes match the
+# lowercased value exactly.
+DEFAULT_RULES = {
+    "title": {
+        "cto": 40, "ceo": 35, "founder": 35, "co-founder": 35, "owner": 30,
+        "vp": 25, "head": 20, "director": 20, "manager": 10,
+    },
+    "company_size": {
+        "1-10": 10, "11-50": 25, "51-200": 20, "201-500": 10, "501-1000": 5,
+    },
+    "country": {
+        "united states": 15, "united kingdom": 10, "canada": 10, "australia": 10, "germany": 8,
+    },
+    "company_focus": {
+        "software": 15, "e-commerce": 15, "ecommerce": 15, "retail": 10, "saas": 15,
+    },
+}
+
+SCORED_FIELDS = tuple(DEFAULT_RULES)
+
+
+def load_rules() -> dict:
+    rules = {k: dict(v) for k, v in DEFAULT_RULES.items()}
+    raw = getattr(settings, "SCORING_RULES", "")
+    if raw:
+        try:
+            overrides = json.loads(raw)
+            for attr, table in overrides.items():
+                if attr not in rules:
+                    raise ValueError(f"unknown attribute {attr!r}")
+                norm = normalize_country if attr == "country" else str.lower
+                rules[attr].update({norm(k): int(v) for k, v in table.items()})
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid SCORING_RULES: {e}") from e
+    return rules
+
+
+class Scorer:
+    def __init__(self, rules: dict | None = None):
+        self.rules = rules or load_rules()
+        self._title = [
+            (re.compile(rf"(?<![\w-]){re.escape(p)}(?![\w-])"), pts)
+            for p, pts in self.rules.get("title", {}).items()
+        ]
+
+    def score(self, c) -> int:
+        total = 0
+        title = (getattr(c, "title", None) or "").lower()
+        if title:
+            # best title match only, so "VP & Head of ..." isn't double counted
+            total += max((pts for rx, pts in self._title if rx.search(title)), default=0)
+        for attr in ("company_size", "country", "company_focus"):
+            v = (getattr(c, attr, None) or "").strip().lower()
+            if attr == "country":
+                v = normalize_country(v)
+            if v:
+                total += self.rules.get(attr, {}).get(v, 0)
+        return total
+
+
+_scorer: Scorer | None = None
+
+
+def scorer() -> Scorer:
+    global _scorer
+    if _scorer is None:
+        _scorer = Scorer()
+    return _scorer
+
+
+def _attrs_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[f].history.has_changes() for f in SCORED_FIELDS)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _rescore(session: Session, flush_context, instances):
+    s = scorer()
+    for obj in session.new:
+        if isinstance(obj, Contact):
+            obj.score = s.score(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Contact) and _attrs_changed(obj):
+            obj.score = s.score(obj)
+
+
+def rescore_all(db: Session) -> int:
+    """Recompute every contact's score (after changing SCORING_RULES). Returns rows changed."""
+    s, changed = scorer(), 0
+    for rows in iter_contact_batches(db):
+        for c in rows:
+            new = s.score(c)
+            if c.score != new:
+                c.score = new
+                changed += 1
+    return changed
@@ -0,0 +1,120 @@
+# app/stats.py
+# Funnel counters kept in `stat_counters` and updated in the same
+# transaction as the Contact/Suppressed writes that change them, so
+# dashboards read a handful of rows instead of GROUP BY-scanning contacts.
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal, dialect_insert
+from .models import Contact, Suppressed, StatCounter
+
+# contact status -> funnel event counted once when a contact enters it
+# (unsubscribes are counted from new Suppressed rows instead)
+STATUS_EVENTS = {"replied": "replied", "bounced": "bounced"}
+
+
+def _day(dt: datetime | None) -> str:
+    return (dt or datetime.now(tz=timezone.utc)).date().isoformat()
+
+
+def _old_new(obj, attr):
+    hist = inspect(obj).attrs[attr].history
+    old = hist.deleted[0] if hist.deleted else None
+    new = hist.added[0] if hist.added else None
+    return hist.has_changes(), old, new
+
+
+def _collect(session: Session) -> Counter:
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Contact):
+            deltas[("status", obj.status or "no_sync")] += 1
+            deltas[("step", str(obj.sequence_step or 0))] += 1
+        elif isinstance(obj, Suppressed):
+            if obj.reason == "unsubscribe":
+                deltas[("event", "unsubscribed")] += 1
+                deltas[("unsubscribed_day", _day(None))] += 1
+    for obj in session.dirty:
+        if not isinstance(obj, Contact):
+            continue
+        changed, old, new = _old_new(obj, "status")
+        if changed and old != new:
+            if old is not None:
+                deltas[("status", old)] -= 1
+            deltas[("status", new)] += 1
+            if new in STATUS_EVENTS:
+                deltas[("event", STATUS_EVENTS[new])] += 1
+                deltas[(f"{STATUS_EVENTS[new]}_day", _day(None))] += 1
+        changed, old, new = _old_new(obj, "sequence_step")
+        if changed and old != new:
+            if old is not None:
+                deltas[("step", str(old))] -= 1
+            deltas[("step", str(new))] += 1
+        changed, _, sent_at = _old_new(obj, "last_sent_at")
+        if changed and sent_at is not None:
+            deltas[("event", "sent")] += 1
+            deltas[("sent_day", _day(sent_at))] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Contact):
+            deltas[("status", obj.status)] -= 1
+            deltas[("step", str(obj.sequence_step))] -= 1
+    return deltas
+
+
+def _upsert_stmt(conn, rows: list[dict]):
+    stmt = dialect_insert(conn, StatCounter).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[StatCounter.metric, StatCounter.bucket],
+        set_={"count": StatCounter.count + stmt.excluded.count},
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _apply_deltas(session: Session, flush_context):
+    # new/dirty and attribute history still reflect the pre-flush state here
+    deltas = _collect(session)
+    rows = [{"metric": m, "bucket": b, "count": n} for (m, b), n in deltas.items() if n and b is not None]
+    if not rows:
+        return
+    conn = session.connection()
+    conn.execute(_upsert_stmt(conn, rows))
+
+
+def rebuild(db: Session) -> int:
+    """Recompute all counters from scratch (one-time seed / repair). Returns rows written."""
+    db.query(StatCounter).delete()
+    counts: Counter = Counter()
+    for status, n in db.query(Contact.status, func.count()).group_by(Contact.status):
+        counts[("status", status)] += n
+        if status in STATUS_EVENTS:
+            counts[("event", STATUS_EVENTS[status])] += n
+    for step, n in db.query(Contact.sequence_step, func.count()).group_by(Contact.sequence_step):
+        counts[("step", str(step))] += n
+    # Only the latest send/reply per contact is stored, so per-day history is approximate
+    sent_day = func.date(Contact.last_sent_at)
+    for day, n in db.query(sent_day, func.count()).filter(Contact.last_sent_at.isnot(None)).group_by(sent_day):
+        counts[("sent_day", str(day))] += n
+        counts[("event", "sent")] += n
+    reply_day = func.date(Contact.last_reply_at)
+    for day, n in db.query(reply_day, func.count()).filter(Contact.last_reply_at.isnot(None)).group_by(reply_day):
+        counts[("replied_day", str(day))] += n
+    unsub_day = func.date(Suppressed.ts)
+    for day, n in db.query(unsub_day, func.count()).filter(Suppressed.reason == "unsubscribe").group_by(unsub_day):
+        counts[("unsubscribed_day", str(day))] += n
+        counts[("event", "unsubscribed")] += n
+    for (metric, bucket), n in counts.items():
+        db.add(StatCounter(metric=metric, bucket=bucket, count=n))
+    db.commit()
+    return len(counts)
+
+
+def snapshot(db: Session) -> dict:
+    """All counters grouped by metric, e.g. {"status": {"no_sync": 10}, "sent_day": {...}}."""
+    out: dict[str, dict[str, int]] = {}
+    for metric, bucket, n in db.query(StatCounter.metric, StatCounter.bucket, StatCounter.count):
+        if n:
+            out.setdefault(metric, {})[bucket] = n
+    return out
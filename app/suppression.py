@@ -0,0 +1,51 @@
+# app/suppression.py
+# Unsubscribe handling: signed per-recipient links and a write buffer.
+# Clicks land in an in-memory overlay immediately (the scheduler checks it
+# before every send) and are persisted to `suppressed_emails` in batches.
+from urllib.parse import urlencode
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Suppressed
+from .tokens import sign, verify
+from .writebuffer import WriteBehindBuffer
+
+UNSUB_PURPOSE = "unsub"
+
+
+def unsubscribe_token(email: str) -> str:
+    return sign(email.strip().lower(), UNSUB_PURPOSE)
+
+
+def unsubscribe_url(email: str) -> str:
+    return f"{settings.UNSUB_BASE_URL}?{urlencode({'t': unsubscribe_token(email)})}"
+
+
+def email_from_token(token: str) -> str | None:
+    return verify(token, UNSUB_PURPOSE)
+
+
+class SuppressionBuffer(WriteBehindBuffer):
+    label = "suppression"
+
+    def add(self, email: str, reason: str = "unsubscribe"):
+        self._put(email, reason)
+
+    def contains(self, email: str) -> bool:
+        with self._lock:
+            return email in self._pending
+
+    def pending(self) -> set[str]:
+        with self._lock:
+            return set(self._pending)
+
+    def _write(self, db: Session, batch: dict[str, str]) -> int:
+        existing = {e for (e,) in db.query(Suppressed.email).filter(Suppressed.email.in_(list(batch)))}
+        new = [Suppressed(email=e, reason=r) for e, r in batch.items() if e not in existing]
+        db.add_all(new)
+        return len(new)
+
+
+buffer = SuppressionBuffer(settings.SUPPRESS_FLUSH_BATCH, settings.SUPPRESS_FLUSH_SECONDS)
+run_flusher = buffer.run_flusher
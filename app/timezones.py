@@ -0,0 +1,130 @@
+# app/timezones.py
+# Recipient time zones: Contact.tz is resolved from Contact.country on flush
+# (like Contact.score), so sends can be released in each recipient's local
+# business hours instead of one fixed TIMEZONE. The same hook keeps
+# Contact.country_key (the normalised country segments filter on) in sync.
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .countries import normalize_country
+from .db import SessionLocal
+from .migrations import iter_contact_batches
+from .models import Contact
+
+# Canonical country name (see app/countries.py) -> IANA zone. Multi-zone
+# countries use their most populous business zone; override per country with COUNTRY_TZ.
+COUNTRY_TZ = {
+    "united states": "America/New_York",
+    "canada": "America/Toronto",
+    "mexico": "America/Mexico_City",
+    "brazil": "America/Sao_Paulo",
+    "argentina": "America/Argentina/Buenos_Aires",
+    "united kingdom": "Europe/London",
+    "ireland": "Europe/Dublin",
+    "germany": "Europe/Berlin",
+    "france": "Europe/Paris",
+    "spain": "Europe/Madrid",
+    "italy": "Europe/Rome",
+    "netherlands": "Europe/Amsterdam",
+    "belgium": "Europe/Brussels",
+    "switzerland": "Europe/Zurich",
+    "sweden": "Europe/Stockholm",
+    "norway": "Europe/Oslo",
+    "denmark": "Europe/Copenhagen",
+    "poland": "Europe/Warsaw",
+    "portugal": "Europe/Lisbon",
+    "turkey": "Europe/Istanbul",
+    "united arab emirates": "Asia/Dubai",
+    "saudi arabia": "Asia/Riyadh",
+    "pakistan": "Asia/Karachi",
+    "india": "Asia/Kolkata",
+    "singapore": "Asia/Singapore",
+    "japan": "Asia/Tokyo",
+    "china": "Asia/Shanghai",
+    "australia": "Australia/Sydney",
+    "new zealand": "Pacific/Auckland",
+    "south africa": "Africa/Johannesburg",
+    "nigeria": "Africa/Lagos",
+    "egypt": "Africa/Cairo",
+}
+
+
+def _country_map() -> dict:
+    mapping = dict(COUNTRY_TZ)
+    raw = getattr(settings, "COUNTRY_TZ", "")
+    try:
+        if raw:
+            mapping.update({normalize_country(k): v for k, v in json.loads(raw).items()})
+        for tz in set(mapping.values()) | {settings.DEFAULT_CONTACT_TZ}:
+            ZoneInfo(tz)
+    except (ValueError, TypeError, AttributeError, ZoneInfoNotFoundError) as e:
+        raise ValueError(f"Invalid COUNTRY_TZ/DEFAULT_CONTACT_TZ: {e}") from e
+    return mapping
+
+
+_map: dict | None = None
+
+
+def country_tz_map() -> dict:
+    global _map
+    if _map is None:
+        _map = _country_map()
+    return _map
+
+
+def resolve_tz(country: str | None) -> str:
+    return country_tz_map().get(normalize_country(country), settings.DEFAULT_CONTACT_TZ)
+
+
+def in_send_window(tz: str, now_utc: datetime) -> bool:
+    """True if `now_utc` falls inside the local business-hours window of `tz`."""
+    try:
+        local = now_utc.astimezone(ZoneInfo(tz))
+    except ZoneInfoNotFoundError:
+        return False
+    if settings.SEND_WEEKDAYS_ONLY and local.weekday() >= 5:
+        return False
+    return settings.SEND_WINDOW_START_HOUR <= local.hour < settings.SEND_WINDOW_END_HOUR
+
+
+def known_zones() -> set[str]:
+    return set(country_tz_map().values()) | {settings.DEFAULT_CONTACT_TZ}
+
+
+def open_zones(now_utc: datetime) -> list[str]:
+    """Zones whose send window is open right now."""
+    return sorted(tz for tz in known_zones() if in_send_window(tz, now_utc))
+
+
+def _set_country(c: Contact) -> bool:
+    """Derive country_key and tz from c.country. Returns True if either changed."""
+    key, tz = normalize_country(c.country) or None, resolve_tz(c.country)
+    if (c.country_key, c.tz) == (key, tz):
+        return False
+    c.country_key, c.tz = key, tz
+    return True
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _resolve(session: Session, flush_context, instances):
+    for obj in session.new:
+        if isinstance(obj, Contact):
+            _set_country(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Contact) and inspect(obj).attrs.country.history.has_changes():
+            _set_country(obj)
+
+
+def resolve_all(db: Session) -> int:
+    """Re-resolve every contact's tz and country_key (after changing COUNTRY_TZ,
+    DEFAULT_CONTACT_TZ or the alias map). Returns rows changed."""
+    changed = 0
+    for rows in iter_contact_batches(db):
+        for c in rows:
+            changed += _set_country(c)
+    return changed
@@ -0,0 +1,55 @@
+# app/tokens.py
+# Compact HMAC-signed tokens for links in outgoing mail (unsubscribe, ...).
+# Format: base64url(payload) + "." + base64url(truncated HMAC-SHA256).
+# Verifiable without a DB read; `purpose` keeps tokens for one link type
+# from being replayed against another.
+import base64
+import hashlib
+import hmac
+from typing import Optional
+
+from .config import settings
+
+SIG_BYTES = 12  # 96-bit tag keeps URLs short
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _unb64(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+
+def require_secret():
+    """Refuse to start without a signing key: every send needs a signed link."""
+    if not settings.SIGNING_SECRET:
+        raise RuntimeError("SIGNING_SECRET is not set")
+
+
+def _secret() -> bytes:
+    require_secret()
+    return settings.SIGNING_SECRET.encode()
+
+
+def _sig(purpose: str, body: str) -> str:
+    mac = hmac.new(_secret(), f"{purpose}:{body}".encode(), hashlib.sha256).digest()
+    return _b64(mac[:SIG_BYTES])
+
+
+def sign(payload: str, purpose: str) -> str:
+    body = _b64(payload.encode("utf-8"))
+    return f"{body}.{_sig(purpose, body)}"
+
+
+def verify(token: str, purpose: str) -> Optional[str]:
+    """Return the payload if the token is authentic for `purpose`, else None."""
+    body, _, sig = (token or "").partition(".")
+    if not body or not sig or not settings.SIGNING_SECRET:
+        return None
+    if not hmac.compare_digest(sig, _sig(purpose, body)):
+        return None
+    try:
+        return _unb64(body).decode("utf-8")
+    except Exception:
+        return None
@@ -0,0 +1,85 @@
+# app/tracking.py
+# Open tracking: a signed per-message pixel URL embedded in HTML bodies.
+# Hits are deduplicated in memory and flushed to `open_events` and
+# Contact.opened_at in batches, so prefetch storms cost one write per batch.
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import dialect_insert
+from .models import Contact, OpenEvent
+from .tokens import sign, verify
+from .writebuffer import WriteBehindBuffer
+
+OPEN_PURPOSE = "open"
+
+# 1x1 transparent GIF, served straight from memory
+PIXEL_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\x00\x00\x00"
+    b"!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+# Remember this many already-flushed (email, step) keys to drop repeat hits early
+SEEN_MAX = 100_000
+
+
+def open_url(email: str, step: int) -> str:
+    return f"{settings.TRACK_BASE_URL.rstrip('/')}/{sign(f'{email.strip().lower()}|{step}', OPEN_PURPOSE)}"
+
+
+def parse_token(token: str) -> tuple[str, int] | None:
+    payload = verify(token, OPEN_PURPOSE)
+    if not payload:
+        return None
+    email, _, step = payload.rpartition("|")
+    try:
+        return email, int(step)
+    except ValueError:
+        return None
+
+
+class OpenBuffer(WriteBehindBuffer):
+    label = "tracking"
+
+    def __init__(self, batch_size: int, interval: float):
+        super().__init__(batch_size, interval)
+        self._seen: set[tuple[str, int]] = set()
+
+    def add(self, email: str, step: int):
+        self._put((email, step), datetime.now(tz=timezone.utc))
+
+    def _accept(self, key) -> bool:
+        # first hit wins; repeats of already-flushed opens are dropped early
+        return key not in self._seen and key not in self._pending
+
+    def _write(self, db: Session, batch: dict[tuple[str, int], datetime]) -> int:
+        events = [{"email": e, "step": s, "ts": ts} for (e, s), ts in batch.items()]
+        # earliest open per contact for opened_at
+        first: dict[str, datetime] = {}
+        for (e, _), ts in batch.items():
+            if e not in first or ts < first[e]:
+                first[e] = ts
+        conn = db.connection()
+        conn.execute(
+            dialect_insert(conn, OpenEvent).on_conflict_do_nothing(index_elements=[OpenEvent.email, OpenEvent.step]),
+            events,
+        )
+        contacts = Contact.__table__
+        conn.execute(
+            update(contacts)
+            .where(contacts.c.email == bindparam("e"), contacts.c.opened_at.is_(None))
+            .values(opened_at=bindparam("ts")),
+            [{"e": e, "ts": ts} for e, ts in first.items()],
+        )
+        return len(events)
+
+    def _flushed(self, batch):
+        if len(self._seen) > SEEN_MAX:
+            self._seen.clear()
+        self._seen.update(batch)
+
+
+buffer = OpenBuffer(settings.OPEN_FLUSH_BATCH, settings.OPEN_FLUSH_SECONDS)
+run_flusher = buffer.run_flusher
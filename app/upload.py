@@ -0,0 +1,271 @@
+# app/upload.py
+# Streaming CSV upload for POST /contacts/import.
+# The request body (raw text/csv or multipart/form-data) is decoded as it
+# arrives and handed through a bounded queue to a worker thread, which parses
+# rows with the csv module and feeds them to the same header mapping and
+# ContactUpserter as run_import.py. Memory stays bounded by the queue size,
+# and DB work never runs on the event loop.
+import asyncio
+import codecs
+import csv
+import queue
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, Optional
+
+from .csv_import import CONTACT_FIELDS, ContactUpserter, map_headers
+from .db import SessionLocal
+
+BATCH_ROWS = 1000      # commit (and report progress) every N unique contacts
+QUEUE_CHUNKS = 64      # max request chunks buffered between receiver and parser
+MAX_JOBS = 100         # finished jobs kept for polling
+MAX_RUNNING = 4        # uploads parsed concurrently (one worker thread each)
+
+_EOF = object()
+
+
+class ImportBusy(Exception):
+    """MAX_RUNNING uploads are already in progress."""
+
+
+@dataclass
+class ImportJob:
+    id: str
+    status: str = "created"  # created | receiving | processing | done | failed
+    bytes_received: int = 0
+    rows_read: int = 0
+    imported: int = 0
+    rejected: dict = field(default_factory=dict)
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._thread = threading.Thread(target=self._run, name=f"import-{self.id}", daemon=True)
+        self._status_lock = threading.Lock()
+        self._eof = False
+
+    def _set_status(self, status: str, error: Optional[str] = None):
+        # "failed" is final: whichever side fails first keeps its error
+        with self._status_lock:
+            if self.status == "failed":
+                return
+            self.status = status
+            if error is not None:
+                self.error = error
+
+    def fail(self, error: str):
+        self._set_status("failed", error)
+
+    def begin(self) -> bool:
+        """Start the parser for this job's body; False if it already received one.
+        Raises ImportBusy when MAX_RUNNING uploads are in progress."""
+        with _jobs_lock:
+            running = sum(j.status in ("receiving", "processing") for j in _jobs.values())
+            with self._status_lock:
+                if self.status != "created":
+                    return False
+                if running >= MAX_RUNNING:
+                    raise ImportBusy(f"{running} imports already running, retry later")
+                self.status = "receiving"
+        self._thread.start()
+        return True
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "bytes_received": self.bytes_received,
+            "rows_read": self.rows_read,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    # --- receiver side (event loop) ---
+    async def feed(self, chunk: bytes):
+        self.bytes_received += len(chunk)
+        # blocks (off-loop) when the parser falls behind -> backpressure on the client
+        await asyncio.to_thread(self._queue.put, chunk)
+
+    async def close_input(self):
+        # before _EOF, so the worker can't finish first and be overwritten
+        if self.status == "receiving":
+            self._set_status("processing")
+        await asyncio.to_thread(self._queue.put, _EOF)
+
+    # --- worker side (thread) ---
+    def _chunks(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _EOF:
+                self._eof = True
+                if self.status == "failed":
+                    # input was cut off: don't parse the partial last row or commit the open batch
+                    raise ValueError(self.error or "upload interrupted")
+                return
+            yield chunk
+
+    def _run(self):
+        db = SessionLocal()
+        try:
+            upserter = ContactUpserter(db, batch_size=BATCH_ROWS)
+            reader = csv.reader(_lines(self._chunks()))
+            header = next(reader, None)
+            if header is None:
+                raise ValueError("Empty upload")
+            mapping = map_headers(header)
+            cols = [mapping.get(h) for h in header]
+            if "email" not in cols:
+                raise ValueError("CSV must contain an Email column (any casing).")
+
+            for raw in reader:
+                self.rows_read += 1
+                row = dict(zip(cols, raw))
+                email = (row.get("email") or "").strip().lower()
+                if not email:
+                    continue
+                values = {}
+                for col in CONTACT_FIELDS:
+                    v = (row.get(col) or "").strip()
+                    if v:
+                        values[col] = v
+                upserter.add(email, values)
+                self.imported = upserter.count
+                self.rejected = upserter.rejected
+
+            upserter.commit()
+            self.imported = upserter.count
+            self._set_status("done")
+        except Exception as e:
+            db.rollback()
+            self.fail(str(e))
+            # keep draining so the receiver never blocks on a full queue
+            while not self._eof:
+                self._eof = self._queue.get() is _EOF
+        finally:
+            db.close()
+            self.finished_at = datetime.now(tz=timezone.utc)
+
+
+def _lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    """Incrementally decode bytes and yield lines with their '\\n' kept (csv needs it for quoted newlines)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buf = ""
+    for chunk in chunks:
+        buf += decoder.decode(chunk)
+        lines = buf.split("\n")
+        buf = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    buf += decoder.decode(b"", final=True)
+    if buf:
+        yield buf
+
+
+async def _multipart_file_chunks(body: AsyncIterator[bytes], content_type: str) -> AsyncIterator[bytes]:
+    """Yield the bytes of the first file part of a multipart body as they are parsed."""
+    from multipart.multipart import MultipartParser, parse_options_header
+
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("Missing multipart boundary")
+
+    out: list[bytes] = []
+    state = {"field": b"", "value": b"", "headers": {}, "want": False, "done": False}
+
+    def on_part_begin():
+        state["headers"] = {}
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["field"].lower()] = state["value"]
+        state["field"], state["value"] = b"", b""
+
+    def on_headers_finished():
+        _, disp = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        state["want"] = not state["done"] and b"filename" in disp
+
+    def on_part_data(data, start, end):
+        if state["want"]:
+            out.append(data[start:end])
+
+    def on_part_end():
+        if state["want"]:
+            state["done"] = True
+            state["want"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in body:
+        parser.write(chunk)
+        if out:
+            yield b"".join(out)
+            out.clear()
+    parser.finalize()
+    if out:
+        yield b"".join(out)
+    if not state["done"]:
+        raise ValueError("No file part found in multipart upload")
+
+
+async def csv_chunks(body: AsyncIterator[bytes], content_type: str) -> AsyncIterator[bytes]:
+    """CSV bytes from a raw (text/csv, application/octet-stream) or multipart request body."""
+    if content_type.lower().startswith("multipart/form-data"):
+        async for chunk in _multipart_file_chunks(body, content_type):
+            yield chunk
+    else:
+        async for chunk in body:
+            if chunk:
+                yield chunk
+
+
+_jobs: dict[str, ImportJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def create_job() -> ImportJob:
+    """Register a job whose body arrives later (PUT /contacts/import/{id})."""
+    job = ImportJob(id=uuid.uuid4().hex)
+    with _jobs_lock:
+        # finished jobs and never-uploaded ones are evicted oldest first
+        idle = [j for j in _jobs.values() if j.finished_at or j.status == "created"]
+        idle.sort(key=lambda j: j.finished_at or j.started_at)
+        for j in idle[: max(0, len(_jobs) - MAX_JOBS + 1)]:
+            _jobs.pop(j.id, None)
+        _jobs[job.id] = job
+    return job
+
+
+def start_job() -> ImportJob:
+    job = create_job()
+    try:
+        job.begin()
+    except ImportBusy:
+        with _jobs_lock:
+            _jobs.pop(job.id, None)
+        raise
+    return job
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
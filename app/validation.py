@@ -0,0 +1,145 @@
+# app/validation.py
+# Pre-flight address validation: syntax/normalization, role accounts,
+# disposable domains and optional MX lookups. Domain-level verdicts are
+# cached in `domain_verdicts` with a TTL, so a large import costs one
+# check per unique domain.
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import DomainVerdict
+
+ROLE_LOCAL_PARTS = {
+    "abuse", "admin", "administrator", "billing", "careers", "contact", "enquiries",
+    "hello", "help", "hr", "info", "inquiries", "jobs", "marketing", "media",
+    "no-reply", "noreply", "office", "postmaster", "press", "privacy", "sales",
+    "security", "support", "team", "webmaster",
+}
+
+DISPOSABLE_DOMAINS = {
+    "10minutemail.com", "discard.email", "dispostable.com", "getnada.com",
+    "guerrillamail.com", "mailinator.com", "maildrop.cc", "mintemail.com",
+    "sharklasers.com", "temp-mail.org", "tempmail.com", "throwawaymail.com",
+    "trashmail.com", "yopmail.com",
+}
+
+# Resolver contract: domain -> True (accepts mail), False (no mail host), None (unknown/transient)
+Resolver = Callable[[str], Optional[bool]]
+
+
+def dns_resolver(domain: str) -> Optional[bool]:
+    """MX lookup via dnspython (installed with email-validator); falls back to an implicit A record."""
+    import dns.exception
+    import dns.resolver
+
+    try:
+        answers = dns.resolver.resolve(domain, "MX", lifetime=5)
+        return any(str(r.exchange).rstrip(".") for r in answers)
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoNameservers):
+        return False
+    except dns.resolver.NoAnswer:
+        pass
+    except dns.exception.DNSException:
+        return None
+    # RFC 5321: no MX record -> the domain's own A/AAAA record is the mail host
+    try:
+        dns.resolver.resolve(domain, "A", lifetime=5)
+        return True
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers):
+        return False
+    except dns.exception.DNSException:
+        return None
+
+
+_resolver: Resolver = dns_resolver
+
+
+def set_resolver(resolver: Resolver):
+    """Swap the MX resolver (e.g. a local stub in tests or offline runs)."""
+    global _resolver
+    _resolver = resolver
+
+
+@dataclass
+class Verdict:
+    ok: bool
+    email: str
+    reason: Optional[str] = None  # syntax | role | disposable | no_mx
+
+
+def _aware(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class AddressValidator:
+    """
+    Validates addresses against one session. Domain verdicts are memoised for
+    the lifetime of the validator and persisted on flush().
+    """
+
+    def __init__(self, db: Session, check_mx: Optional[bool] = None, resolver: Optional[Resolver] = None):
+        self.db = db
+        self.check_mx = settings.VALIDATE_MX if check_mx is None else check_mx
+        self.resolver = resolver or _resolver
+        self.ttl = timedelta(hours=settings.DOMAIN_VERDICT_TTL_HOURS)
+        self.disposable = DISPOSABLE_DOMAINS | {
+            d.strip().lower() for d in settings.DISPOSABLE_DOMAINS.split(",") if d.strip()
+        }
+        self._domains: dict[str, tuple[bool, Optional[str]]] = {}
+        self._pending: dict[str, DomainVerdict] = {}
+
+    def check(self, email: str) -> Verdict:
+        from email_validator import EmailNotValidError, validate_email
+
+        raw = (email or "").strip()
+        try:
+            v = validate_email(raw, check_deliverability=False)
+        except EmailNotValidError:
+            return Verdict(False, raw.lower(), "syntax")
+
+        normalized = v.normalized.lower()
+        if settings.REJECT_ROLE_ACCOUNTS and v.local_part.lower() in ROLE_LOCAL_PARTS:
+            return Verdict(False, normalized, "role")
+
+        ok, reason = self._domain_verdict(v.ascii_domain.lower())
+        return Verdict(ok, normalized, reason)
+
+    def _domain_verdict(self, domain: str) -> tuple[bool, Optional[str]]:
+        cached = self._domains.get(domain)
+        if cached is not None:
+            return cached
+
+        now = datetime.now(tz=timezone.utc)
+        row = self.db.get(DomainVerdict, domain)
+        if row is not None and _aware(row.checked_at) > now - self.ttl:
+            verdict = (row.ok, row.reason)
+            self._domains[domain] = verdict
+            return verdict
+
+        if domain in self.disposable:
+            verdict = (False, "disposable")
+        elif self.check_mx:
+            has_mx = self.resolver(domain)
+            if has_mx is None:
+                # transient DNS failure: allow for now, don't persist
+                self._domains[domain] = (True, None)
+                return True, None
+            verdict = (True, None) if has_mx else (False, "no_mx")
+        else:
+            # Nothing decisive to persist when MX checks are off
+            self._domains[domain] = (True, None)
+            return True, None
+
+        self._domains[domain] = verdict
+        self._pending[domain] = DomainVerdict(domain=domain, ok=verdict[0], reason=verdict[1], checked_at=now)
+        return verdict
+
+    def flush(self):
+        """Stage new domain verdicts on the session; the caller commits."""
+        for dv in self._pending.values():
+            self.db.merge(dv)
+        self._pending.clear()
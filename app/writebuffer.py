@@ -0,0 +1,76 @@
+# app/writebuffer.py
+# Write-behind buffer shared by unsubscribes and open tracking: requests
+# record into an in-memory dict, and one transaction persists the batch
+# when it fills up, on a timer, and at shutdown. Entries stay visible in
+# `_pending` until they are durable, so a failed flush is simply retried.
+import asyncio
+import threading
+
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+
+
+class WriteBehindBuffer:
+    label = "buffer"
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict = {}
+
+    # --- subclass hooks ---
+    def _accept(self, key) -> bool:
+        """Called under the lock; False drops the entry (e.g. a duplicate)."""
+        return True
+
+    def _write(self, db: Session, batch: dict) -> int:
+        """Persist `batch` on `db` (committed by the caller). Returns rows written."""
+        raise NotImplementedError
+
+    def _flushed(self, batch: dict):
+        """Called under the lock after `batch` is committed."""
+
+    # --- shared ---
+    def _put(self, key, value):
+        with self._lock:
+            if not self._accept(key):
+                return
+            self._pending[key] = value
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered entries in one transaction. Returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+            if not batch:
+                return 0
+            db = SessionLocal()
+            try:
+                n = self._write(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            with self._lock:
+                for key, value in batch.items():
+                    if self._pending.get(key) == value:
+                        del self._pending[key]
+                self._flushed(batch)
+            return n
+
+    async def run_flusher(self):
+        """Background task: flush every `interval` seconds."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"[{self.label}] ⚠️ flush failed, will retry: {e}")
@@ -0,0 +1,86 @@
+# scripts/check_import_time.py
+# Import-time budget check for CI / pre-deploy.
+# - Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+# - Fails (exit 1) if a heavy dependency is loaded eagerly at import time
+# - Fails (exit 1) if cumulative import time exceeds the budget
+#
+# Usage:
+#   python scripts/check_import_time.py                 # checks app.main + app.csv_import
+#   IMPORT_BUDGET_MS=800 python scripts/check_import_time.py app.main
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> budget in milliseconds (cumulative, as reported by -X importtime)
+DEFAULT_TARGETS = {
+    "app.main": 1500,
+    "app.csv_import": 800,
+}
+
+# Must only be imported on first use, never when the app/CLI starts
+LAZY_MODULES = (
+    "google.generativeai",
+    "pandas",
+    "apscheduler",
+    "aiosmtplib",
+    "jinja2",
+)
+
+
+def measure(module: str) -> tuple[int, set[str]]:
+    """Return (cumulative microseconds for `module`, set of modules imported)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        raise SystemExit(f"import {module} failed")
+
+    total_us, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        loaded.add(name)
+        if name == module:
+            try:
+                total_us = int(parts[1].strip())
+            except ValueError:
+                pass
+    return total_us, loaded
+
+
+def main() -> int:
+    modules = sys.argv[1:] or list(DEFAULT_TARGETS)
+    override = os.getenv("IMPORT_BUDGET_MS")
+    failed = False
+
+    for module in modules:
+        budget_ms = int(override) if override else DEFAULT_TARGETS.get(module, 1000)
+        total_us, loaded = measure(module)
+        total_ms = total_us / 1000
+
+        eager = sorted(m for m in loaded if m in LAZY_MODULES)
+        status = "ok"
+        if eager:
+            status = "FAIL (eager: " + ", ".join(eager) + ")"
+            failed = True
+        elif total_ms > budget_ms:
+            status = "FAIL (over budget)"
+            failed = True
+        print(f"[importtime] {module}: {total_ms:.1f} ms (budget {budget_ms} ms) {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
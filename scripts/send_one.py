@@ -15,6 +15,7 @@ from app.config import settings
 from app.models import Contact
 from app.emailer import send_email
 from app.ai import build_email  # <-- same prompt/logic as scheduler
+from app.suppression import unsubscribe_url
 
 
 # ----------------------------
@@ -44,7 +45,7 @@ def load_contact_for_context():
         "from_name": settings.FROM_NAME,
         "portfolio_url": settings.PORTFOLIO_URL,
         "cv_url": settings.CV_URL,
-        "unsub_url": settings.UNSUB_BASE_URL,
+        "unsub_url": unsubscribe_url("veronica@desanticorp.com"),
     }
 
 
@@ -59,7 +60,7 @@ def build_ctx(contact: DummyContact | Contact) -> dict:
         "from_name": settings.FROM_NAME,
         "portfolio_url": settings.PORTFOLIO_URL,
         "cv_url": settings.CV_URL,
-        "unsub_url": settings.UNSUB_BASE_URL,
+        "unsub_url": unsubscribe_url(contact_email),
     }
     return ctx
 
@@ -72,7 +73,7 @@ async def main():
     subject, body = build_email(STEP, ctx)
 
     # Send to TEST_TO (hardcoded) so you can eyeball rendering/deliverability
-    await send_email(TEST_TO, subject, body)
+    await send_email(TEST_TO, subject, body, unsub_url=ctx["unsub_url"])
 
     # Console breadcrumbs
     print("=== ONE-OFF SEND COMPLETE ===")